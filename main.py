@@ -34,9 +34,12 @@ async def main() -> None:
         config = load_config("config.yaml")
         logger.info(f"Loaded configuration for {len(config.restaurants)} restaurants")
 
-        # Initialize and start monitor service
+        # Initialize and run monitor service until interrupted
         monitor = MonitorService(config)
-        await monitor.start()
+        try:
+            await monitor.run_forever()
+        finally:
+            await monitor.stop()
     except KeyboardInterrupt:
         logger.info("Shutting down gracefully...")
     except Exception as e:
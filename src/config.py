@@ -2,18 +2,38 @@
 Configuration management module
 """
 
+import hashlib
 import os
 import re
+import threading
 import yaml
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, fields
 from dotenv import load_dotenv
 import logging
+from src.utils import json_dumps, json_loads
+
+# Prefer the libyaml C loader; fall back to the pure-Python loader
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 logger = logging.getLogger(__name__)
 
-# Simple email validation regex
-EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Suffix of the parsed-config JSON sidecar written next to config.yaml
+CONFIG_CACHE_SUFFIX = ".json"
+
+# Suffix of the digest of the last config that passed validation
+CONFIG_HASH_SUFFIX = ".hash"
+
+# In-process cache of loaded configs:
+# absolute path -> ((st_mtime_ns, st_size, st_ino), Config)
+_CONFIG_CACHE: dict[str, tuple[tuple[int, int, int], "Config"]] = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+# Simple email validation regex (used with fullmatch, so no anchors needed)
+EMAIL_REGEX = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}', re.ASCII)
 
 
 @dataclass
@@ -23,6 +43,8 @@ class MonitorConfig:
     interval_max: int
     random_delay_max: int
     run_immediately: bool = True
+    max_concurrency: int = 3  # Restaurants fetched at the same time
+    adaptive_interval: bool = False  # Check more often when slots usually appear
 
 
 @dataclass
@@ -59,11 +81,27 @@ class Config:
     restaurants: list[RestaurantConfig]
     gmail: GmailConfig
 
+    @property
+    def enabled_restaurants(self) -> tuple[RestaurantConfig, ...]:
+        """Restaurants with enabled set, in config order"""
+        return tuple(r for r in self.restaurants if r.enabled)
+
 
 def load_config(config_path: str = "config.yaml") -> Config:
     """
     Load configuration from YAML file and environment variables
 
+    Loaded configs are cached in-process by absolute path and reused while
+    the file's (mtime, size, inode) and the app password are unchanged, so a
+    repeat call costs one os.stat. The returned Config is shared between
+    callers and must be treated as read-only.
+
+    Across processes, the parsed configuration is cached next to the YAML
+    file as JSON in ``<config_path>.json`` and reused while the file's
+    contents are unchanged, so warm runs skip YAML parsing. A digest of the file
+    contents is kept in ``<config_path>.hash`` so validation is skipped for
+    contents that already passed.
+
     Args:
         config_path: Path to config.yaml file
 
@@ -78,28 +116,97 @@ def load_config(config_path: str = "config.yaml") -> Config:
     load_dotenv()
 
     # Check if config file exists
-    if not Path(config_path).exists():
+    path = os.path.abspath(config_path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Configuration file '{config_path}' not found. "
             f"Please copy config.yaml.example to config.yaml and configure it."
-        )
+        ) from None
+
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    app_password = os.getenv('GMAIL_APP_PASSWORD', '')
+
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(path)
+        if (
+            cached is not None
+            and cached[0] == signature
+            and cached[1].gmail.app_password == app_password
+        ):
+            logger.debug(f"Using already loaded configuration from {config_path}")
+            return cached[1]
+
+        config = _load_config_file(config_path, app_password)
+        _CONFIG_CACHE[path] = (signature, config)
+
+    logger.info(f"Configuration loaded successfully from {config_path}")
+    return config
+
 
-    # Load YAML configuration
+def _load_config_file(config_path: str, app_password: str) -> Config:
+    """
+    Read, parse and validate config.yaml, using the on-disk caches
+
+    Raises:
+        ValueError: If configuration is invalid
+    """
+    # Read the file once; the bytes feed both the parser and the digest
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config_data = yaml.safe_load(f)
-    except yaml.YAMLError as e:
-        raise ValueError(f"Failed to parse YAML configuration: {e}") from e
+        with open(config_path, 'rb') as f:
+            raw = f.read()
     except Exception as e:
         raise ValueError(f"Failed to read configuration file: {e}") from e
 
+    # The cached Config is keyed on the contents, not the mtime, so a file
+    # replaced with its old timestamp kept (cp -p, rsync -t) is re-parsed
+    cache_path = Path(f"{config_path}{CONFIG_CACHE_SUFFIX}")
+    source_digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    config = _load_cached_config(cache_path, source_digest)
+    if config is None:
+        config = _parse_config_file(raw)
+        _save_cached_config(cache_path, source_digest, config)
+
+    # App password comes from the environment and is never cached
+    config.gmail.app_password = app_password
+
+    # Validate configuration, unless these exact contents already passed
+    hash_path = Path(f"{config_path}{CONFIG_HASH_SUFFIX}")
+    digest = _config_digest(raw, bool(app_password))
+    if _read_config_hash(hash_path) != digest:
+        errors = validate_config(config)
+        if errors:
+            error_msg = "Configuration validation failed:\n  - " + "\n  - ".join(errors)
+            raise ValueError(error_msg)
+        _write_config_hash(hash_path, digest)
+
+    return config
+
+
+def _parse_config_file(raw: bytes) -> Config:
+    """
+    Parse config.yaml contents into a Config object (without the app password)
+
+    Raises:
+        ValueError: If the YAML cannot be parsed
+    """
+    # Load YAML configuration from bytes; the loader decodes UTF-8 itself
+    try:
+        config_data = yaml.load(raw, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Failed to parse YAML configuration: {e}") from e
+
     # Parse monitor settings
     monitor_data = config_data.get('monitor', {})
     monitor = MonitorConfig(
         interval_min=monitor_data.get('interval_min', 5),
         interval_max=monitor_data.get('interval_max', 10),
         random_delay_max=monitor_data.get('random_delay_max', 120),
-        run_immediately=monitor_data.get('run_immediately', True)
+        run_immediately=monitor_data.get('run_immediately', True),
+        max_concurrency=monitor_data.get('max_concurrency', 3),
+        adaptive_interval=monitor_data.get('adaptive_interval', False)
     )
 
     # Parse omakase credentials
@@ -121,35 +228,109 @@ def load_config(config_path: str = "config.yaml") -> Config:
         for r in restaurants_data
     ]
 
-    # Parse Gmail settings (get app password from environment)
+    # Parse Gmail settings (app password is filled in from the environment)
     gmail_data = config_data.get('notification', {}).get('gmail', {})
-    gmail_app_password = os.getenv('GMAIL_APP_PASSWORD', '')
-
     gmail = GmailConfig(
         smtp_server=gmail_data.get('smtp_server', 'smtp.gmail.com'),
         smtp_port=gmail_data.get('smtp_port', 587),
         sender_email=gmail_data.get('sender_email', ''),
-        app_password=gmail_app_password,
+        app_password='',
         receiver_email=gmail_data.get('receiver_email', '')
     )
 
-    config = Config(
+    return Config(
         monitor=monitor,
         omakase=omakase,
         restaurants=restaurants,
         gmail=gmail
     )
 
-    # Validate configuration
-    errors = validate_config(config)
-    if errors:
-        error_msg = "Configuration validation failed:\n  - " + "\n  - ".join(errors)
-        raise ValueError(error_msg)
 
-    logger.info(f"Configuration loaded successfully from {config_path}")
+def _load_cached_config(cache_path: Path, source_digest: str) -> Config | None:
+    """Return the cached Config if it was built from the current config file"""
+    try:
+        cached = json_loads(cache_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable config cache {cache_path}: {e}")
+        return None
+
+    if cached.get('source_digest') != source_digest:
+        return None
+
+    try:
+        data = cached['config']
+        config = Config(
+            monitor=_from_cached_dict(MonitorConfig, data['monitor']),
+            omakase=_from_cached_dict(OmakaseConfig, data['omakase']),
+            restaurants=[
+                _from_cached_dict(RestaurantConfig, r) for r in data['restaurants']
+            ],
+            gmail=_from_cached_dict(GmailConfig, {**data['gmail'], 'app_password': ''})
+        )
+    except (KeyError, TypeError) as e:
+        logger.warning(f"Ignoring stale config cache {cache_path}: {e}")
+        return None
+
+    logger.debug(f"Using cached configuration from {cache_path}")
     return config
 
 
+def _from_cached_dict(cls, data: dict):
+    """
+    Build a config dataclass from cached fields
+
+    Raises:
+        KeyError: If the cached fields don't match the dataclass, e.g. the
+            cache was written before a field was added
+    """
+    if data.keys() != {f.name for f in fields(cls)}:
+        raise KeyError(f"{cls.__name__} fields changed")
+    return cls(**data)
+
+
+def _save_cached_config(
+    cache_path: Path, source_digest: str, config: Config
+) -> None:
+    """Atomically write the parsed Config to the JSON cache file"""
+    data = asdict(config)
+    # The app password comes from the environment and never touches disk
+    del data['gmail']['app_password']
+
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(json_dumps({'source_digest': source_digest, 'config': data}))
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Failed to write config cache {cache_path}: {e}")
+
+
+def _config_digest(raw: bytes, has_app_password: bool) -> bytes:
+    """Digest of the config contents plus the env state validation depends on"""
+    digest = hashlib.blake2b(raw, digest_size=16)
+    digest.update(b'\x01' if has_app_password else b'\x00')
+    return digest.digest()
+
+
+def _read_config_hash(hash_path: Path) -> bytes | None:
+    """Read the digest of the last configuration that passed validation"""
+    try:
+        return hash_path.read_bytes()
+    except OSError:
+        return None
+
+
+def _write_config_hash(hash_path: Path, digest: bytes) -> None:
+    """Atomically record the digest of a configuration that passed validation"""
+    tmp_path = hash_path.with_name(hash_path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(digest)
+        os.replace(tmp_path, hash_path)
+    except OSError as e:
+        logger.warning(f"Failed to write config hash {hash_path}: {e}")
+
+
 def validate_config(config: Config) -> list[str]:
     """
     Validate configuration and return list of errors
@@ -169,11 +350,13 @@ def validate_config(config: Config) -> list[str]:
         errors.append("monitor.interval_max must be >= interval_min")
     if config.monitor.random_delay_max < 0:
         errors.append("monitor.random_delay_max must be non-negative")
+    if config.monitor.max_concurrency < 1:
+        errors.append("monitor.max_concurrency must be at least 1")
 
     # Validate omakase credentials
     if not config.omakase.email:
         errors.append("omakase.email is required")
-    elif not EMAIL_REGEX.match(config.omakase.email):
+    elif not EMAIL_REGEX.fullmatch(config.omakase.email):
         errors.append("omakase.email is not a valid email address")
     if not config.omakase.password:
         errors.append("omakase.password is required")
@@ -182,8 +365,7 @@ def validate_config(config: Config) -> list[str]:
     if not config.restaurants:
         errors.append("At least one restaurant must be configured")
 
-    enabled_restaurants = [r for r in config.restaurants if r.enabled]
-    if not enabled_restaurants:
+    if not config.enabled_restaurants:
         errors.append("At least one restaurant must be enabled")
 
     for i, restaurant in enumerate(config.restaurants):
@@ -197,14 +379,14 @@ def validate_config(config: Config) -> list[str]:
     # Validate Gmail settings
     if not config.gmail.sender_email:
         errors.append("notification.gmail.sender_email is required")
-    elif not EMAIL_REGEX.match(config.gmail.sender_email):
+    elif not EMAIL_REGEX.fullmatch(config.gmail.sender_email):
         errors.append(
             "notification.gmail.sender_email is not a valid email address"
         )
 
     if not config.gmail.receiver_email:
         errors.append("notification.gmail.receiver_email is required")
-    elif not EMAIL_REGEX.match(config.gmail.receiver_email):
+    elif not EMAIL_REGEX.fullmatch(config.gmail.receiver_email):
         errors.append(
             "notification.gmail.receiver_email is not a valid email address"
         )
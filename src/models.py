@@ -2,14 +2,14 @@
 Data models for Omakase Monitor
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
 # Base URL for omakase.in
 OMAKASE_BASE_URL = "https://omakase.in"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TimeSlot:
     """Represents a restaurant reservation time slot"""
     date: str  # YYYY-MM-DD format
@@ -17,14 +17,12 @@ class TimeSlot:
     price: int | None = None  # Price in JPY
     booking_url: str | None = None
     available_seats: int | None = None
+    # (date, time) identity used for change detection, built once here since
+    # slots are immutable; not part of equality (all fields above are)
+    key: tuple[str, str] = field(init=False, repr=False, compare=False)
 
-    def __hash__(self) -> int:
-        return hash((self.date, self.time))
-
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, TimeSlot):
-            return False
-        return (self.date, self.time) == (other.date, other.time)
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'key', (self.date, self.time))
 
 
 @dataclass
@@ -34,16 +32,15 @@ class Restaurant:
     slug: str  # URL slug (e.g., "bu286225")
     url: str
     enabled: bool = True
-
-    @property
-    def detail_url(self) -> str:
-        """Full restaurant detail page URL"""
-        return f"{OMAKASE_BASE_URL}/ja/r/{self.slug}"
-
-    @property
-    def api_url(self) -> str:
-        """API endpoint for time slots"""
-        return f"{OMAKASE_BASE_URL}/api/v1/omakase/r/{self.slug}/online_stock_groups"
+    # Derived from slug in __post_init__ (slug never changes after construction)
+    detail_url: str = field(init=False, repr=False)  # Full restaurant detail page URL
+    api_url: str = field(init=False, repr=False)  # API endpoint for time slots
+
+    def __post_init__(self) -> None:
+        self.detail_url = f"{OMAKASE_BASE_URL}/ja/r/{self.slug}"
+        self.api_url = (
+            f"{OMAKASE_BASE_URL}/api/v1/omakase/r/{self.slug}/online_stock_groups"
+        )
 
 
 @dataclass
@@ -4,196 +4,365 @@ Core monitoring service
 
 import asyncio
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Set
+from operator import attrgetter
+from pathlib import Path
 from src.models import Restaurant, TimeSlot, NotificationData
-from src.config import Config, RestaurantConfig
+from src.config import Config
 from src.omakase_client import OmakaseClient
 from src.notifier import GmailNotifier
-from src.utils import random_delay
+from src.poll_schedule import AdaptiveInterval
+from src.utils import _RNG, json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
+# Previously seen slots, persisted across restarts
+STATE_FILE = "previous_slots.json"
+
+# A slot's identity for change detection: its (date, time), as precomputed
+# in TimeSlot.key. Price or link changes on an existing slot are not
+# reported as a new slot.
+SlotKey = tuple[str, str]
+_slot_key = attrgetter('key')
+
 
 class MonitorService:
     """Main monitoring service"""
 
     def __init__(self, config: Config):
         self.config = config
-        self.previous_slots: Dict[str, Set[TimeSlot]] = {}
+        # Enabled restaurants, converted to models once up front
+        self._restaurants: tuple[Restaurant, ...] = tuple(
+            Restaurant(
+                name=r.name,
+                slug=r.slug,
+                url=r.url,
+                enabled=r.enabled
+            )
+            for r in config.enabled_restaurants
+        )
+        # (date, time) keys of the slots seen in the last cycle, indexed like
+        # self._restaurants and restored from disk so a restart doesn't
+        # re-report every slot
+        self._state_path = Path(STATE_FILE)
+        self._state_lock = threading.Lock()
+        # Whether previous_slots[idx] reflects a real earlier check, so the
+        # first check of a restaurant isn't counted as a slot release
+        self._has_baseline = [False] * len(self._restaurants)
+        self.previous_slots: list[frozenset[SlotKey]] = (
+            self._load_state()
+        )
+        # Learns when new slots tend to appear to time the next check
+        self.poll_schedule = AdaptiveInterval(
+            config.monitor.interval_min,
+            config.monitor.interval_max,
+            [restaurant.slug for restaurant in self._restaurants]
+        )
+        # One client for the lifetime of the service, so the connection pool
+        # and session cookies carry over between monitoring cycles
+        self.client = OmakaseClient()
         self.notifier = GmailNotifier(
             smtp_server=config.gmail.smtp_server,
             smtp_port=config.gmail.smtp_port,
             sender_email=config.gmail.sender_email,
             app_password=config.gmail.app_password
         )
+        # All emails go out through one dedicated thread, which keeps the
+        # notifier's SMTP connection on a single thread
+        self._mail_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mail"
+        )
         logger.info(
-            f"MonitorService initialized with {len(config.restaurants)} restaurants"
+            "MonitorService initialized with %d restaurants",
+            len(config.restaurants)
         )
 
+    @property
+    def restaurants(self) -> tuple[Restaurant, ...]:
+        """Enabled restaurants, in the order previous_slots is indexed"""
+        return self._restaurants
+
     async def start(self) -> None:
         """
         Start monitoring service
 
-        This is the main entry point that runs a single monitoring cycle.
-        For continuous monitoring, this should be called repeatedly by a scheduler.
+        This runs a single monitoring cycle. For continuous monitoring use
+        run_forever(), or call this repeatedly from a scheduler; the HTTP
+        client stays open between calls until stop() is called.
         """
         logger.info("=" * 60)
         logger.info("Starting monitoring cycle")
         logger.info("=" * 60)
 
-        # Get enabled restaurants
-        enabled_restaurants = [
-            r for r in self.config.restaurants if r.enabled
-        ]
-
-        if not enabled_restaurants:
+        if not self._restaurants:
             logger.warning("No enabled restaurants to monitor")
             return
 
-        logger.info(f"Monitoring {len(enabled_restaurants)} restaurants")
+        logger.info("Monitoring %d restaurants", len(self._restaurants))
 
-        # Use omakase client
-        async with OmakaseClient() as client:
-            # Login
-            login_success = await client.login(
-                self.config.omakase.email,
-                self.config.omakase.password
-            )
+        # Open the omakase client on first use; it stays open after
+        await self.client.start()
 
-            if not login_success:
-                logger.error("Failed to login to omakase.in")
-                return
+        # Login (skipped while a saved session is in use)
+        login_success = await self.client.login(
+            self.config.omakase.email,
+            self.config.omakase.password
+        )
 
-            # Monitor each restaurant
-            for restaurant_config in enabled_restaurants:
-                await self._monitor_restaurant(client, restaurant_config)
+        if not login_success:
+            logger.error("Failed to login to omakase.in")
+            return
 
-                # Add delay between restaurants to avoid rate limiting
-                await random_delay(2.0, 5.0)
+        # Fetch all restaurants concurrently over the shared
+        # connection, capped to stay rate-limit friendly
+        slots_by_slug = await self.client.get_time_slots_many(
+            [restaurant.slug for restaurant in self._restaurants],
+            max_concurrency=self.config.monitor.max_concurrency
+        )
+
+        # Seen slots before this cycle, restored if the email can't be sent
+        pre_cycle_slots = list(self.previous_slots)
+        notifications = []
+        notified = []  # Indexes of the restaurants in notifications
+        for idx, restaurant in enumerate(self._restaurants):
+            # A failed fetch leaves the previous slots untouched
+            if restaurant.slug in slots_by_slug:
+                notification = self._check_restaurant(
+                    idx, restaurant, slots_by_slug[restaurant.slug]
+                )
+                if notification:
+                    notifications.append(notification)
+                    notified.append(idx)
+
+        # Everything found this cycle goes out in a single email. If it
+        # fails, those slots are not marked as seen so the next cycle (or a
+        # restart) reports them again
+        if notifications and not await self._send_notifications(notifications):
+            for idx in notified:
+                self.previous_slots[idx] = pre_cycle_slots[idx]
+
+        # Persist the updated cache and arrival history off the event loop
+        await asyncio.to_thread(self._persist_state, self._dump_state())
+        if self.config.monitor.adaptive_interval:
+            await asyncio.to_thread(self.poll_schedule.save)
 
         logger.info("Monitoring cycle completed")
         logger.info("=" * 60)
 
-    async def _monitor_restaurant(
-        self, client: OmakaseClient, restaurant_config: RestaurantConfig
-    ) -> None:
+    async def run_forever(self) -> None:
         """
-        Monitor a single restaurant for new time slots
+        Run monitoring cycles until cancelled
 
-        Args:
-            client: Authenticated OmakaseClient
-            restaurant_config: Restaurant configuration
+        Cycles are separated by a random wait between monitor.interval_min
+        and monitor.interval_max minutes, biased towards the shorter end at
+        times of day when new slots have appeared before if
+        monitor.adaptive_interval is set. The first cycle runs right away
+        when monitor.run_immediately is set.
         """
+        if self.config.monitor.run_immediately:
+            await self._run_cycle()
+
+        while True:
+            if self.config.monitor.adaptive_interval:
+                wait_minutes = self.poll_schedule.next_wait(datetime.now())
+            else:
+                wait_minutes = _RNG.uniform(
+                    self.config.monitor.interval_min,
+                    self.config.monitor.interval_max
+                )
+            logger.info("Next check in %.1f minutes", wait_minutes)
+            await asyncio.sleep(wait_minutes * 60)
+            await self._run_cycle()
+
+    async def _run_cycle(self) -> None:
+        """Run one cycle, logging failures so the loop keeps going"""
         try:
-            logger.info(f"Checking restaurant: {restaurant_config.name}")
-
-            # Convert RestaurantConfig to Restaurant model
-            restaurant = Restaurant(
-                name=restaurant_config.name,
-                slug=restaurant_config.slug,
-                url=restaurant_config.url,
-                enabled=restaurant_config.enabled
-            )
+            await self.start()
+        except Exception as e:
+            logger.error("Monitoring cycle failed: %s", e, exc_info=True)
+
+    async def stop(self) -> None:
+        """Close the HTTP client and the notifier's SMTP connection"""
+        await self.client.stop()
+        await asyncio.get_running_loop().run_in_executor(
+            self._mail_executor, self.notifier.close
+        )
+        self._mail_executor.shutdown()
+
+    def _check_restaurant(
+        self, idx: int, restaurant: Restaurant, current_slots: list[TimeSlot]
+    ) -> NotificationData | None:
+        """
+        Compare fetched time slots for a restaurant against the last cycle
 
-            # Fetch current time slots
-            current_slots = await client.get_time_slots(restaurant.slug)
+        Args:
+            idx: Index of the restaurant in self._restaurants
+            restaurant: Restaurant that was checked
+            current_slots: Time slots fetched for the restaurant
+
+        Returns:
+            Notification about the new time slots, or None if there are none
+        """
+        try:
+            logger.info("Checking restaurant: %s", restaurant.name)
 
             if not current_slots:
-                logger.info(f"No available time slots for {restaurant.name}")
+                logger.info("No available time slots for %s", restaurant.name)
                 # Update cache with empty set
-                self.previous_slots[restaurant.slug] = set()
-                return
+                self.previous_slots[idx] = frozenset()
+                self._has_baseline[idx] = True
+                return None
 
             logger.info(
-                f"Found {len(current_slots)} time slots for {restaurant.name}"
+                "Found %d time slots for %s", len(current_slots), restaurant.name
             )
 
-            # Convert to set for comparison
-            current_slots_set = set(current_slots)
-
             # Detect new slots
-            new_slots = self.detect_new_slots(restaurant, current_slots_set)
+            new_slots = self.detect_new_slots(idx, current_slots)
+
+            # Only a change from a known earlier state counts as a release
+            if (
+                new_slots
+                and self._has_baseline[idx]
+                and self.config.monitor.adaptive_interval
+            ):
+                self.poll_schedule.record_arrival(restaurant.slug, datetime.now())
+            self._has_baseline[idx] = True
 
             if new_slots:
                 logger.info(
-                    f"🎉 Detected {len(new_slots)} NEW time slots "
-                    f"for {restaurant.name}!"
+                    "🎉 Detected %d NEW time slots for %s!",
+                    len(new_slots), restaurant.name
                 )
 
-                # Log details of new slots
-                for slot in sorted(new_slots, key=lambda s: (s.date, s.time)):
-                    price_str = f"¥{slot.price:,}" if slot.price else "N/A"
-                    logger.info(f"  - {slot.date} {slot.time} ({price_str})")
+                # Log details of new slots (skip the sort when INFO is off)
+                if logger.isEnabledFor(logging.INFO):
+                    for slot in sorted(new_slots, key=_slot_key):
+                        price_str = f"¥{slot.price:,}" if slot.price else "N/A"
+                        logger.info(
+                            "  - %s %s (%s)", slot.date, slot.time, price_str
+                        )
+
+                return NotificationData(
+                    restaurant=restaurant,
+                    new_slots=new_slots,
+                    timestamp=datetime.now()
+                )
 
-                # Send notification
-                await self._send_notification(restaurant, list(new_slots))
-            else:
-                logger.info(f"No new time slots for {restaurant.name}")
+            logger.info("No new time slots for %s", restaurant.name)
 
         except Exception as e:
             logger.error(
-                f"Error monitoring restaurant {restaurant_config.name}: {e}",
+                "Error monitoring restaurant %s: %s", restaurant.name, e,
                 exc_info=True
             )
+        return None
 
     def detect_new_slots(
-        self, restaurant: Restaurant, current_slots: Set[TimeSlot]
-    ) -> Set[TimeSlot]:
+        self, idx: int, current_slots: list[TimeSlot]
+    ) -> list[TimeSlot]:
         """
         Detect newly available time slots
 
+        Slots are identified by their (date, time) pair.
+
         Args:
-            restaurant: Restaurant object
-            current_slots: Set of currently available time slots
+            idx: Index of the restaurant in self.restaurants
+            current_slots: Currently available time slots
 
         Returns:
-            Set of newly detected time slots
+            Newly detected time slots, in their original order
         """
-        previous = self.previous_slots.get(restaurant.slug, set())
-        new_slots = current_slots - previous
+        current = {_slot_key(slot): slot for slot in current_slots}
+        new_keys = current.keys() - self.previous_slots[idx]
 
         # Update cache
-        self.previous_slots[restaurant.slug] = current_slots
+        self.previous_slots[idx] = frozenset(current)
+
+        return [slot for key, slot in current.items() if key in new_keys]
 
-        return new_slots
+    def _load_state(self) -> list[frozenset[SlotKey]]:
+        """Load previously seen slot keys from the state file"""
+        state = [frozenset()] * len(self._restaurants)
+        if not self._state_path.exists():
+            return state
 
-    async def _send_notification(
-        self, restaurant: Restaurant, new_slots: list[TimeSlot]
-    ) -> None:
+        try:
+            # The file is keyed by slug so it survives config reordering
+            data = json_loads(self._state_path.read_bytes())
+            for idx, restaurant in enumerate(self._restaurants):
+                if restaurant.slug in data:
+                    state[idx] = frozenset(
+                        (date, time) for date, time in data[restaurant.slug]
+                    )
+                    self._has_baseline[idx] = True
+            logger.info(
+                "Loaded previous slots for %d restaurants from %s",
+                len(data), self._state_path
+            )
+        except Exception as e:
+            logger.warning("Failed to load state from %s: %s", self._state_path, e)
+            state = [frozenset()] * len(self._restaurants)
+        return state
+
+    def _dump_state(self) -> bytes:
+        """Serialize previously seen slot keys as JSON, keyed by slug"""
+        return json_dumps({
+            restaurant.slug: sorted(keys)
+            for restaurant, keys in zip(self._restaurants, self.previous_slots)
+        })
+
+    def _persist_state(self, data: bytes) -> None:
+        """Atomically write serialized state to the state file"""
+        tmp_path = self._state_path.with_name(self._state_path.name + ".tmp")
+        with self._state_lock:
+            try:
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, self._state_path)
+            except OSError as e:
+                logger.error("Failed to save state to %s: %s", self._state_path, e)
+
+    async def _send_notifications(
+        self, notifications: list[NotificationData]
+    ) -> bool:
         """
-        Send email notification about new time slots
+        Email this cycle's new time slots, one section per restaurant
+
+        Sending runs on the dedicated mail thread so the SMTP connection
+        stays on a single thread.
 
         Args:
-            restaurant: Restaurant object
-            new_slots: List of new time slots
+            notifications: New time slots, one entry per restaurant
+
+        Returns:
+            True if the email was sent, False otherwise
         """
+        loop = asyncio.get_running_loop()
+        names = ", ".join(n.restaurant.name for n in notifications)
         try:
-            notification = NotificationData(
-                restaurant=restaurant,
-                new_slots=new_slots,
-                timestamp=datetime.now()
-            )
-
-            # Send email in a separate thread to avoid blocking
-            success = await asyncio.to_thread(
-                self.notifier.send_notification,
+            success = await loop.run_in_executor(
+                self._mail_executor,
+                self.notifier.send_batch,
                 self.config.gmail.receiver_email,
-                notification
+                notifications
             )
 
             if success:
-                logger.info(
-                    f"✉️  Notification sent for {restaurant.name} "
-                    f"({len(new_slots)} slots)"
-                )
+                for notification in notifications:
+                    logger.info(
+                        "✉️  Notification sent for %s (%d slots)",
+                        notification.restaurant.name,
+                        len(notification.new_slots)
+                    )
             else:
-                logger.error(
-                    f"Failed to send notification for {restaurant.name}"
-                )
+                logger.error("Failed to send notification for %s", names)
+            return success
 
         except Exception as e:
             logger.error(
-                f"Error sending notification for {restaurant.name}: {e}",
-                exc_info=True
+                "Error sending notification for %s: %s", names, e, exc_info=True
             )
+            return False
@@ -2,15 +2,94 @@
 Email notification module using Gmail SMTP
 """
 
-import html
 import logging
 import smtplib
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from string import Template
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from src.models import NotificationData
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait on any SMTP socket operation. Without it, probing a
+# connection dropped while idle between cycles can block the mail thread
+# until the TCP retransmit timeout
+SMTP_TIMEOUT = 30.0
+
+# Same replacements as html.escape(quote=True), applied in one pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+# Static parts of the notification email; only the $fields vary per email
+_HEADER_TMPL = Template("""
+        <html>
+        <body>
+            <h2>New Reservations Available: $restaurant_name</h2>
+            <p>Found $count new time slot(s):</p>
+            <table border="1" cellpadding="5" cellspacing="0">
+                <tr>
+                    <th>Date</th>
+                    <th>Time</th>
+                    <th>Price</th>
+                    <th>Action</th>
+                </tr>
+                """)
+
+_ROW_TMPL = Template("""
+            <tr>
+                <td>$date</td>
+                <td>$time</td>
+                <td>$price</td>
+                <td><a href="$link">Book Now</a></td>
+            </tr>
+            """)
+
+_FOOTER_TMPL = Template("""
+            </table>
+            <p><a href="$detail_url">View Restaurant Page</a></p>
+            <p><small>Timestamp: $timestamp</small></p>
+        </body>
+        </html>
+        """)
+
+# Per-cycle digest covering several restaurants, one section per restaurant
+_BATCH_HEADER_TMPL = Template("""
+        <html>
+        <body>
+            <h2>New Reservations Available at $restaurant_count Restaurants</h2>
+            <p>Found $count new time slot(s):</p>
+            """)
+
+_SECTION_HEADER_TMPL = Template("""
+            <h3>$restaurant_name ($count)</h3>
+            <table border="1" cellpadding="5" cellspacing="0">
+                <tr>
+                    <th>Date</th>
+                    <th>Time</th>
+                    <th>Price</th>
+                    <th>Action</th>
+                </tr>
+                """)
+
+_SECTION_FOOTER_TMPL = Template("""
+            </table>
+            <p><a href="$detail_url">View Restaurant Page</a></p>
+            """)
+
+_BATCH_FOOTER_TMPL = Template("""
+            <p><small>Timestamp: $timestamp</small></p>
+        </body>
+        </html>
+        """)
+
 
 class GmailNotifier:
     """Gmail email notifier"""
@@ -26,97 +105,197 @@ class GmailNotifier:
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.app_password = app_password
+        # Persistent SMTP connection, reused across notifications
+        self._smtp: smtplib.SMTP | None = None
+        # smtplib connections are not thread-safe
+        self._lock = threading.Lock()
+        # (epoch second, formatted string) of the last email timestamp
+        self._last_ts: tuple[int, str] = (0, "")
+
+    def close(self) -> None:
+        """Close the persistent SMTP connection, if any"""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _get_conn(self) -> smtplib.SMTP:
+        """Return a live SMTP connection, reconnecting if needed"""
+        if self._smtp is not None:
+            try:
+                status, _ = self._smtp.noop()
+                if status == 250:
+                    return self._smtp
+            except OSError:
+                pass
+            logger.debug("SMTP connection is stale, reconnecting")
+            self.close()
+
+        server = smtplib.SMTP(
+            self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT
+        )
+        try:
+            server.starttls()
+            server.login(self.sender_email, self.app_password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
 
     def send_notification(
         self, receiver_email: str, notification: NotificationData
     ) -> bool:
         """Send email notification about new time slots"""
+        restaurant_name = notification.restaurant.name
+        subject = f"[Omakase] {restaurant_name} - New Reservations Available"
+        return self._send(
+            receiver_email, subject, lambda: self._build_email_body(notification)
+        )
+
+    def send_batch(
+        self, receiver_email: str, notifications: list[NotificationData]
+    ) -> bool:
+        """
+        Send one email covering new time slots at several restaurants
+
+        A single notification is sent as a regular per-restaurant email.
+        """
+        if len(notifications) == 1:
+            return self.send_notification(receiver_email, notifications[0])
+
+        subject = (
+            f"[Omakase] New Reservations Available at "
+            f"{len(notifications)} Restaurants"
+        )
+        return self._send(
+            receiver_email, subject, lambda: self._build_batch_body(notifications)
+        )
+
+    def _send(
+        self, receiver_email: str, subject: str, build_body: Callable[[], str]
+    ) -> bool:
+        """Build and send one HTML email over the persistent connection"""
         try:
-            restaurant_name = notification.restaurant.name
-            subject = (
-                f"[Omakase] {restaurant_name} - New Reservations Available"
-            )
-            body = self._build_email_body(notification)
+            body = build_body()
 
-            message = MIMEMultipart("alternative")
+            # A single HTML part needs no multipart wrapper
+            message = MIMEText(body, "html", "utf-8")
             message["Subject"] = subject
             message["From"] = self.sender_email
             message["To"] = receiver_email
 
-            html_part = MIMEText(body, "html")
-            message.attach(html_part)
-
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.app_password)
-                server.sendmail(
-                    self.sender_email, receiver_email, message.as_string()
-                )
+            with self._lock:
+                server = self._get_conn()
+                try:
+                    # send_message flattens straight to bytes (no as_string())
+                    server.send_message(
+                        message,
+                        from_addr=self.sender_email,
+                        to_addrs=[receiver_email]
+                    )
+                except Exception:
+                    # Start from a fresh connection after any failure
+                    self.close()
+                    raise
 
-            logger.info(f"Notification sent successfully to {receiver_email}")
+            logger.info("Notification sent successfully to %s", receiver_email)
             return True
 
         except smtplib.SMTPAuthenticationError as e:
             logger.error(
-                f"SMTP authentication failed. Check email and app password: {e}"
+                "SMTP authentication failed. Check email and app password: %s", e
             )
             return False
         except smtplib.SMTPException as e:
-            logger.error(f"SMTP error occurred: {e}", exc_info=True)
+            logger.error("SMTP error occurred: %s", e, exc_info=True)
             return False
         except Exception as e:
             logger.error(
-                f"Unexpected error sending notification: {e}", exc_info=True
+                "Unexpected error sending notification: %s", e, exc_info=True
             )
             return False
 
-    @staticmethod
-    def _build_email_body(notification: NotificationData) -> str:
+    def _format_timestamp(self, timestamp: datetime) -> str:
+        """Format a timestamp, reusing the last result within the same second"""
+        sec = int(timestamp.timestamp())
+        last_sec, last_str = self._last_ts
+        if sec == last_sec:
+            return last_str
+
+        formatted = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+        self._last_ts = (sec, formatted)
+        return formatted
+
+    def _build_email_body(self, notification: NotificationData) -> str:
         """Build HTML email body with proper escaping"""
         # Escape restaurant name for HTML
-        restaurant_name = html.escape(notification.restaurant.name)
+        restaurant_name = notification.restaurant.name.translate(
+            _HTML_ESCAPE_TABLE
+        )
+
+        # Escape the fallback booking link once for all rows
+        detail_url = notification.restaurant.detail_url.translate(
+            _HTML_ESCAPE_TABLE
+        )
+
+        timestamp = self._format_timestamp(notification.timestamp)
+
+        return (
+            _HEADER_TMPL.substitute(
+                restaurant_name=restaurant_name,
+                count=len(notification.new_slots)
+            )
+            + self._build_rows(notification, detail_url)
+            + _FOOTER_TMPL.substitute(detail_url=detail_url, timestamp=timestamp)
+        )
+
+    def _build_batch_body(self, notifications: list[NotificationData]) -> str:
+        """Build HTML body for a digest with one section per restaurant"""
+        parts = [_BATCH_HEADER_TMPL.substitute(
+            restaurant_count=len(notifications),
+            count=sum(len(n.new_slots) for n in notifications)
+        )]
+
+        for notification in notifications:
+            detail_url = notification.restaurant.detail_url.translate(
+                _HTML_ESCAPE_TABLE
+            )
+            parts.append(_SECTION_HEADER_TMPL.substitute(
+                restaurant_name=notification.restaurant.name.translate(
+                    _HTML_ESCAPE_TABLE
+                ),
+                count=len(notification.new_slots)
+            ))
+            parts.append(self._build_rows(notification, detail_url))
+            parts.append(_SECTION_FOOTER_TMPL.substitute(detail_url=detail_url))
+
+        timestamp = self._format_timestamp(
+            max(n.timestamp for n in notifications)
+        )
+        parts.append(_BATCH_FOOTER_TMPL.substitute(timestamp=timestamp))
+        return "".join(parts)
 
-        slots_html = ""
+    def _build_rows(self, notification: NotificationData, detail_url: str) -> str:
+        """Build the escaped table rows for a notification's slots"""
+        rows = []
         for slot in notification.new_slots:
-            # Escape all dynamic content
-            date = html.escape(slot.date)
-            time = html.escape(slot.time)
             price_str = f"¥{slot.price:,}" if slot.price else "N/A"
-            price_escaped = html.escape(price_str)
 
             # URLs are validated, but still escape for safety
-            link = html.escape(
-                slot.booking_url or notification.restaurant.detail_url
+            link = (
+                slot.booking_url.translate(_HTML_ESCAPE_TABLE)
+                if slot.booking_url else detail_url
             )
 
-            slots_html += f"""
-            <tr>
-                <td>{date}</td>
-                <td>{time}</td>
-                <td>{price_escaped}</td>
-                <td><a href="{link}">Book Now</a></td>
-            </tr>
-            """
-
-        detail_url = html.escape(notification.restaurant.detail_url)
-        timestamp = notification.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-
-        return f"""
-        <html>
-        <body>
-            <h2>New Reservations Available: {restaurant_name}</h2>
-            <p>Found {len(notification.new_slots)} new time slot(s):</p>
-            <table border="1" cellpadding="5" cellspacing="0">
-                <tr>
-                    <th>Date</th>
-                    <th>Time</th>
-                    <th>Price</th>
-                    <th>Action</th>
-                </tr>
-                {slots_html}
-            </table>
-            <p><a href="{detail_url}">View Restaurant Page</a></p>
-            <p><small>Timestamp: {timestamp}</small></p>
-        </body>
-        </html>
-        """
+            # Escape all dynamic content
+            rows.append(_ROW_TMPL.substitute(
+                date=slot.date.translate(_HTML_ESCAPE_TABLE),
+                time=slot.time.translate(_HTML_ESCAPE_TABLE),
+                price=price_str.translate(_HTML_ESCAPE_TABLE),
+                link=link
+            ))
+        return "".join(rows)
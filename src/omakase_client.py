@@ -2,30 +2,73 @@
 HTTP client for omakase.in API
 """
 
+import asyncio
+import html
 import json
 import logging
+import re
+import time
+from http.cookiejar import Cookie
 from pathlib import Path
 import httpx
-from bs4 import BeautifulSoup
 from src.models import TimeSlot, OMAKASE_BASE_URL
-from src.utils import retry_on_failure, random_delay
+from src.utils import (
+    retry_on_failure, random_delay, json_dumps, json_loads, RateLimiter
+)
 from src.parser import OmakaseParser
 
 logger = logging.getLogger(__name__)
 
 COOKIES_FILE = "cookies.json"
 
+# Seconds an idle pooled connection is kept open (longer than a polling interval)
+KEEPALIVE_EXPIRY = 15 * 60.0
+
+# Default cap on in-flight requests for get_time_slots_many
+MAX_CONCURRENT_REQUESTS = 16
+
+# CSRF token on the login page, in either attribute order:
+# <meta name="csrf-token" content="..."> or <input name="authenticity_token" value="...">
+_CSRF_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        rb'''<meta\s[^>]*?name=["']csrf-token["'][^>]*?content=["']([^"']+)''',
+        rb'''<meta\s[^>]*?content=["']([^"']+)["'][^>]*?name=["']csrf-token["']''',
+        rb'''<input\s[^>]*?name=["']authenticity_token["'][^>]*?value=["']([^"']+)''',
+        rb'''<input\s[^>]*?value=["']([^"']+)["'][^>]*?name=["']authenticity_token["']''',
+    )
+)
+
 
 class OmakaseClient:
     """HTTP client for omakase.in"""
 
     def __init__(self, cookies_file: str = COOKIES_FILE):
         self.session: httpx.AsyncClient | None = None
-        self.cookies: dict = {}
+        self.cookies: list[dict] = []
         self.cookies_file = Path(cookies_file)
         self.is_logged_in = False
+        # Only delays requests when the server signals rate limiting
+        self.rate_limiter = RateLimiter()
 
     async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def start(self) -> None:
+        """
+        Open the HTTP session
+
+        The session can stay open across monitoring cycles so pooled
+        connections (and their TLS/HTTP/2 state) are reused between scans.
+        Calling start() on an open client is a no-op.
+        """
+        if self.session:
+            return
+
         user_agent = (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
             "AppleWebKit/537.36"
@@ -35,50 +78,110 @@ class OmakaseClient:
             "q=0.9,*/*;q=0.8"
         )
 
+        # HTTP/2 multiplexes concurrent restaurant requests over one
+        # connection and compresses the repeated cookie/header block.
+        # Idle connections are kept long enough to survive the gap between
+        # polling cycles (the server may still close them; httpx reconnects)
         self.session = httpx.AsyncClient(
+            http2=True,
             timeout=30.0,
             follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
             headers={
                 "User-Agent": user_agent,
                 "Accept": accept_header,
                 "Accept-Language": "ja,en-US;q=0.9,en;q=0.8",
+            },
+            event_hooks={
+                "request": [self.rate_limiter.wait],
+                "response": [self.rate_limiter.update],
             }
         )
 
         # Load cookies from file if they exist
         self._load_cookies()
 
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def stop(self) -> None:
+        """Close the HTTP session"""
         if self.session:
             await self.session.aclose()
+            self.session = None
 
     def _load_cookies(self) -> None:
-        """Load cookies from file"""
+        """Load cookies from file, skipping any that have expired"""
         if self.cookies_file.exists():
             try:
-                with open(self.cookies_file, 'r') as f:
-                    self.cookies = json.load(f)
+                data = json_loads(self.cookies_file.read_bytes())
+                if isinstance(data, dict):
+                    # Legacy format: flat {name: value} mapping
+                    data = [{'name': k, 'value': v} for k, v in data.items()]
+
+                now = time.time()
+                self.cookies = [
+                    c for c in data
+                    if c.get('expires') is None or c['expires'] > now
+                ]
                 if self.session:
-                    self.session.cookies.update(self.cookies)
-                logger.info("Loaded cookies from file")
-                self.is_logged_in = True
+                    for c in self.cookies:
+                        self.session.cookies.jar.set_cookie(self._make_cookie(c))
+                logger.info(f"Loaded {len(self.cookies)} cookies from file")
+                self.is_logged_in = bool(self.cookies)
             except Exception as e:
                 logger.warning(f"Failed to load cookies: {e}")
-                self.cookies = {}
+                self.cookies = []
 
     def _save_cookies(self) -> None:
-        """Save cookies to file"""
+        """Atomically save cookies, with their domain/path/expiry, to file"""
+        tmp_file = self.cookies_file.with_name(self.cookies_file.name + ".tmp")
         try:
             if self.session:
-                self.cookies = dict(self.session.cookies)
-            with open(self.cookies_file, 'w') as f:
-                json.dump(self.cookies, f)
+                self.cookies = [
+                    {
+                        'name': c.name,
+                        'value': c.value,
+                        'domain': c.domain,
+                        'path': c.path,
+                        'expires': c.expires,
+                        'secure': c.secure,
+                    }
+                    for c in self.session.cookies.jar
+                ]
+            # Write a temp file and swap it in so a crash never leaves a
+            # truncated cookies file behind
+            tmp_file.write_bytes(json_dumps(self.cookies))
+            tmp_file.replace(self.cookies_file)
             logger.info("Saved cookies to file")
         except Exception as e:
             logger.error(f"Failed to save cookies: {e}")
 
+    @staticmethod
+    def _make_cookie(data: dict) -> Cookie:
+        """Build a cookiejar Cookie from a saved cookie record"""
+        domain = data.get('domain') or ''
+        expires = data.get('expires')
+        return Cookie(
+            version=0,
+            name=data['name'],
+            value=data['value'],
+            port=None,
+            port_specified=False,
+            domain=domain,
+            domain_specified=bool(domain),
+            domain_initial_dot=domain.startswith('.'),
+            path=data.get('path') or '/',
+            path_specified=True,
+            secure=bool(data.get('secure', False)),
+            expires=expires,
+            discard=expires is None,
+            comment=None,
+            comment_url=None,
+            rest={},
+        )
+
     async def _get_csrf_token(self) -> str | None:
         """Extract CSRF token from login page"""
         if not self.session:
@@ -88,17 +191,11 @@ class OmakaseClient:
             response = await self.session.get(f"{OMAKASE_BASE_URL}/users/sign_in")
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Look for CSRF token in meta tag
-            csrf_meta = soup.find('meta', attrs={'name': 'csrf-token'})
-            if csrf_meta and csrf_meta.get('content'):
-                return csrf_meta['content']
-
-            # Look for CSRF token in hidden input field
-            csrf_input = soup.find('input', attrs={'name': 'authenticity_token'})
-            if csrf_input and csrf_input.get('value'):
-                return csrf_input['value']
+            # Scan the raw bytes: meta tag first, then the hidden input field
+            for pattern in _CSRF_PATTERNS:
+                match = pattern.search(response.content)
+                if match:
+                    return html.unescape(match.group(1).decode('ascii'))
 
             logger.error("CSRF token not found in login page")
             return None
@@ -136,9 +233,6 @@ class OmakaseClient:
                 logger.error("Cannot proceed without CSRF token")
                 return False
 
-            # Add small delay to mimic human behavior
-            await random_delay(1.0, 2.0)
-
             # Prepare login data
             login_data = {
                 'authenticity_token': csrf_token,
@@ -210,8 +304,8 @@ class OmakaseClient:
             response = await self.session.get(api_url)
             response.raise_for_status()
 
-            # Parse JSON response
-            data = response.json()
+            # Parse JSON straight from the response bytes
+            data = json_loads(response.content)
 
             # Parse time slots using the flexible parser
             time_slots = OmakaseParser.parse_time_slots(data)
@@ -231,7 +325,7 @@ class OmakaseClient:
                 f"HTTP error fetching time slots: {e.response.status_code}"
             )
             raise
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # also raised by orjson
             logger.error(f"Failed to parse JSON response: {e}")
             return []
         except Exception as e:
@@ -239,3 +333,49 @@ class OmakaseClient:
                 f"Unexpected error fetching time slots: {e}", exc_info=True
             )
             raise
+
+    async def get_time_slots_many(
+        self,
+        restaurant_slugs: list[str],
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS
+    ) -> dict[str, list[TimeSlot]]:
+        """
+        Fetch available time slots for several restaurants concurrently
+
+        Requests share the session (multiplexed over one HTTP/2 connection)
+        and at most max_concurrency of them are in flight at once.
+
+        Args:
+            restaurant_slugs: Restaurant URL slugs
+            max_concurrency: Maximum number of concurrent requests
+
+        Returns:
+            Mapping of slug to its available TimeSlot objects. Slugs whose
+            fetch failed are left out (the error is logged).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = await asyncio.gather(
+            *(
+                self._get_time_slots_limited(slug, semaphore)
+                for slug in restaurant_slugs
+            ),
+            return_exceptions=True
+        )
+
+        time_slots = {}
+        for slug, result in zip(restaurant_slugs, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to fetch time slots for {slug}: {result}")
+                continue
+            time_slots[slug] = result
+        return time_slots
+
+    async def _get_time_slots_limited(
+        self, restaurant_slug: str, semaphore: asyncio.Semaphore
+    ) -> list[TimeSlot]:
+        """Fetch time slots for one restaurant while holding the semaphore"""
+        # Small jitter so concurrent requests don't hit the API in lockstep;
+        # taken before the semaphore so it doesn't hold up other fetches
+        await random_delay(0.0, 1.0)
+        async with semaphore:
+            return await self.get_time_slots(restaurant_slug)
@@ -2,12 +2,46 @@
 HTML and JSON parser for omakase.in responses
 """
 
+import json
 import logging
+import re
+from collections.abc import Iterator
 from datetime import datetime
 from src.models import TimeSlot
 
 logger = logging.getLogger(__name__)
 
+# Alternative key names for each slot field, in priority order
+_ALIASES = {
+    'date': ('date', 'day', 'booking_date', 'reservation_date'),
+    'time': ('time', 'start_time', 'booking_time', 'reservation_time'),
+    'price': ('price', 'amount', 'cost', 'price_amount'),
+    'booking_url': ('booking_url', 'url', 'link', 'reservation_url', 'booking_link'),
+    'available_seats': ('available_seats', 'seats', 'capacity', 'available'),
+}
+
+# Top-level keys that may wrap the slot data, in priority order
+_GROUP_KEYS = ('slots', 'data', 'time_slots', 'availability', 'online_stock_groups')
+
+# strptime fallbacks for dates/times the fast paths don't handle
+_DATE_FMTS = ('%Y-%m-%d', '%Y/%m/%d', '%Y%m%d', '%d-%m-%Y', '%d/%m/%Y')
+_TIME_FMTS = ('%H:%M', '%H:%M:%S', '%I:%M %p', '%H%M')
+
+# 12-hour clock time such as "7:00 PM" (same ranges strptime's %I:%M %p accepts)
+_TIME_AMPM_RE = re.compile(r'(1[0-2]|0[1-9]|[1-9]):([0-5]\d|\d)\s+([AP])M', re.ASCII | re.IGNORECASE)
+
+# A digit and a date separator anywhere in the string, in either order
+_DATE_SHAPE_RE = re.compile(r'\d.*[-/年月日]|[-/年月日].*\d', re.DOTALL)
+
+
+def _pick(item: dict, keys: tuple[str, ...]):
+    """Return the value of the first key in keys that is present and not null"""
+    for key in keys:
+        value = item.get(key)
+        if value is not None:
+            return value
+    return None
+
 
 class OmakaseParser:
     """Parser for omakase.in API responses"""
@@ -39,36 +73,61 @@ class OmakaseParser:
         logger.debug(f"API response keys: {api_response.keys() if isinstance(api_response, dict) else 'N/A'}")
 
         try:
-            # Case 1: Response is a list
-            if isinstance(api_response, list):
-                return OmakaseParser._parse_slot_list(api_response)
-
-            # Case 2: Response is a dict
-            if isinstance(api_response, dict):
-                # Try common key names for slot data
-                for key in ['slots', 'data', 'time_slots', 'availability', 'online_stock_groups']:
-                    if key in api_response:
-                        data = api_response[key]
-                        if isinstance(data, list):
-                            return OmakaseParser._parse_slot_list(data)
-                        elif isinstance(data, dict):
-                            return OmakaseParser._parse_grouped_slots(data)
-
-                # If no known key found, try to parse the dict directly
-                return OmakaseParser._parse_grouped_slots(api_response)
-
-            logger.warning(f"Unexpected API response type: {type(api_response)}")
-            return []
-
+            # One pass over every slot dict, whatever the response shape
+            parse_single_slot = OmakaseParser._parse_single_slot
+            parsed_slots = [
+                slot
+                for date_hint, slot_data in OmakaseParser._iter_items(api_response)
+                if (slot := parse_single_slot(slot_data, date_hint)) is not None
+            ]
         except Exception as e:
             logger.error(f"Error parsing API response: {e}", exc_info=True)
             logger.debug(f"Failed response content: {api_response}")
             return []
 
+        logger.info(f"Parsed {len(parsed_slots)} time slots")
+        return parsed_slots
+
     @staticmethod
-    def _parse_slot_list(slots: list) -> list[TimeSlot]:
+    def _iter_items(api_response: dict | list) -> Iterator[tuple[str | None, dict]]:
         """
-        Parse a list of time slot objects
+        Yield (date_hint, slot_data) pairs, dispatching on the response shape once
+
+        date_hint is the grouping date key for grouped responses, else None.
+        """
+        # JSON decoding only produces plain lists and dicts, so exact
+        # type checks are enough here
+        response_type = type(api_response)
+
+        # Case 1: Response is a list
+        if response_type is list:
+            yield from OmakaseParser._iter_slot_list(api_response)
+            return
+
+        # Case 2: Response is a dict
+        if response_type is dict:
+            # Try common key names for slot data; fall back to the
+            # dict itself when none holds a list or dict
+            data = next(
+                (
+                    api_response[key] for key in _GROUP_KEYS
+                    if type(api_response.get(key)) in (list, dict)
+                ),
+                api_response
+            )
+            if type(data) is list:
+                yield from OmakaseParser._iter_slot_list(data)
+            else:
+                # Grouped by date (or no known key: parse the dict directly)
+                yield from OmakaseParser._iter_grouped_slots(data)
+            return
+
+        logger.warning(f"Unexpected API response type: {type(api_response)}")
+
+    @staticmethod
+    def _iter_slot_list(slots: list) -> Iterator[tuple[None, dict]]:
+        """
+        Yield (None, slot_data) pairs from a list of time slot objects
 
         Expected format:
         [
@@ -76,27 +135,16 @@ class OmakaseParser:
             {"date": "2026-02-01", "time": "21:00", "price": 15000, ...}
         ]
         """
-        parsed_slots = []
-
         for slot_data in slots:
-            if not isinstance(slot_data, dict):
+            if type(slot_data) is dict:
+                yield None, slot_data
+            else:
                 logger.warning(f"Skipping non-dict slot: {slot_data}")
-                continue
-
-            try:
-                slot = OmakaseParser._parse_single_slot(slot_data)
-                if slot:
-                    parsed_slots.append(slot)
-            except Exception as e:
-                logger.warning(f"Failed to parse slot {slot_data}: {e}")
-
-        logger.info(f"Parsed {len(parsed_slots)} time slots from list")
-        return parsed_slots
 
     @staticmethod
-    def _parse_grouped_slots(grouped: dict) -> list[TimeSlot]:
+    def _iter_grouped_slots(grouped: dict) -> Iterator[tuple[str, dict]]:
         """
-        Parse slots grouped by date
+        Yield (date_key, slot_data) pairs from slots grouped by date
 
         Expected format:
         {
@@ -107,9 +155,14 @@ class OmakaseParser:
             "2026-02-02": [...]
         }
         """
-        parsed_slots = []
-
         for date_key, slots_data in grouped.items():
+            # Cheap reject for metadata keys such as "status" or "next_page":
+            # an ASCII identifier can't contain a date separator and can't be
+            # all digits, so _looks_like_date would reject it anyway
+            if type(date_key) is str and date_key.isascii() and date_key.isidentifier():
+                logger.debug(f"Skipping non-date key: {date_key}")
+                continue
+
             # Try to validate if key looks like a date
             if not OmakaseParser._looks_like_date(date_key):
                 logger.debug(f"Skipping non-date key: {date_key}")
@@ -120,25 +173,13 @@ class OmakaseParser:
                 continue
 
             for slot_data in slots_data:
-                if not isinstance(slot_data, dict):
-                    continue
-
-                try:
-                    # Add date to slot data if not present
-                    if 'date' not in slot_data:
-                        slot_data['date'] = date_key
-
-                    slot = OmakaseParser._parse_single_slot(slot_data)
-                    if slot:
-                        parsed_slots.append(slot)
-                except Exception as e:
-                    logger.warning(f"Failed to parse slot for {date_key}: {e}")
-
-        logger.info(f"Parsed {len(parsed_slots)} time slots from grouped data")
-        return parsed_slots
+                if type(slot_data) is dict:
+                    yield date_key, slot_data
 
     @staticmethod
-    def _parse_single_slot(slot_data: dict) -> TimeSlot | None:
+    def _parse_single_slot(
+        slot_data: dict, date_hint: str | None = None
+    ) -> TimeSlot | None:
         """
         Parse a single time slot object
 
@@ -147,23 +188,24 @@ class OmakaseParser:
 
         Args:
             slot_data: Dictionary containing slot information
+            date_hint: Date the slot is grouped under, used when the slot
+                has no "date" field of its own
 
         Returns:
             TimeSlot object or None if required fields are missing
         """
-        # Extract date - try multiple possible keys
-        date = None
-        for date_key in ['date', 'day', 'booking_date', 'reservation_date']:
-            if date_key in slot_data:
-                date = str(slot_data[date_key])
-                break
-
-        # Extract time - try multiple possible keys
-        time = None
-        for time_key in ['time', 'start_time', 'booking_time', 'reservation_time']:
-            if time_key in slot_data:
-                time = str(slot_data[time_key])
-                break
+        # Extract date/time - first non-null alias wins, except that the
+        # grouping date stands in for a missing "date" field, and for a
+        # null one when no other alias has a date either
+        if date_hint is not None and 'date' not in slot_data:
+            date = date_hint
+        else:
+            date = _pick(slot_data, _ALIASES['date'])
+            if date is None:
+                date = date_hint
+        time = _pick(slot_data, _ALIASES['time'])
+        date = '' if date is None else str(date)
+        time = '' if time is None else str(time)
 
         if not date or not time:
             logger.debug(f"Missing required fields (date/time) in slot: {slot_data}")
@@ -175,32 +217,14 @@ class OmakaseParser:
         # Normalize time format (HH:MM)
         time = OmakaseParser._normalize_time(time)
 
-        # Extract price - try multiple possible keys
-        price = None
-        for price_key in ['price', 'amount', 'cost', 'price_amount']:
-            if price_key in slot_data:
-                try:
-                    price = int(slot_data[price_key])
-                    break
-                except (ValueError, TypeError):
-                    pass
-
-        # Extract booking URL - try multiple possible keys
-        booking_url = None
-        for url_key in ['booking_url', 'url', 'link', 'reservation_url', 'booking_link']:
-            if url_key in slot_data:
-                booking_url = str(slot_data[url_key])
-                break
-
-        # Extract available seats - try multiple possible keys
-        available_seats = None
-        for seats_key in ['available_seats', 'seats', 'capacity', 'available']:
-            if seats_key in slot_data:
-                try:
-                    available_seats = int(slot_data[seats_key])
-                    break
-                except (ValueError, TypeError):
-                    pass
+        # Extract optional fields
+        price = OmakaseParser._first_int(slot_data, _ALIASES['price'])
+        booking_url = _pick(slot_data, _ALIASES['booking_url'])
+        if booking_url is not None:
+            booking_url = str(booking_url)
+        available_seats = OmakaseParser._first_int(
+            slot_data, _ALIASES['available_seats']
+        )
 
         return TimeSlot(
             date=date,
@@ -210,6 +234,17 @@ class OmakaseParser:
             available_seats=available_seats
         )
 
+    @staticmethod
+    def _first_int(slot_data: dict, keys: tuple[str, ...]) -> int | None:
+        """Return the first value under one of keys that converts to int"""
+        for key in keys:
+            if key in slot_data:
+                try:
+                    return int(slot_data[key])
+                except (ValueError, TypeError, OverflowError):
+                    pass
+        return None
+
     @staticmethod
     def _normalize_date(date_str: str) -> str:
         """
@@ -224,10 +259,22 @@ class OmakaseParser:
         if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
             return date_str
 
-        # Try common formats
-        for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%Y%m%d', '%d-%m-%Y', '%d/%m/%Y']:
+        # Fast paths for machine-generated formats (avoid strptime)
+        n = len(date_str)
+        if n == 10 and date_str[4] == '/' and date_str[7] == '/':
+            year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+            if OmakaseParser._is_ymd(year, month, day):
+                return f"{year}-{month}-{day}"
+        elif n == 8:
+            year, month, day = date_str[:4], date_str[4:6], date_str[6:]
+            if OmakaseParser._is_ymd(year, month, day):
+                return f"{year}-{month}-{day}"
+
+        # Try common formats (strptime bound once for the loop)
+        strptime = datetime.strptime
+        for fmt in _DATE_FMTS:
             try:
-                dt = datetime.strptime(date_str, fmt)
+                dt = strptime(date_str, fmt)
                 return dt.strftime('%Y-%m-%d')
             except ValueError:
                 continue
@@ -253,10 +300,28 @@ class OmakaseParser:
         if len(time_str) == 8 and time_str[2] == ':' and time_str[5] == ':':
             return time_str[:5]
 
-        # Try to parse various formats
-        for fmt in ['%H:%M', '%H:%M:%S', '%I:%M %p', '%H%M']:
+        # Fast paths for HHMM and H:MM (avoid strptime)
+        if len(time_str) == 4:
+            if time_str[1] == ':':
+                hour, minute = '0' + time_str[0], time_str[2:]
+            else:
+                hour, minute = time_str[:2], time_str[2:]
+            if OmakaseParser._is_hm(hour, minute):
+                return f"{hour}:{minute}"
+
+        # Fast path for 12-hour times like "7:00 PM"
+        match = _TIME_AMPM_RE.fullmatch(time_str)
+        if match:
+            hour = int(match.group(1)) % 12
+            if match.group(3) in 'Pp':
+                hour += 12
+            return f"{hour:02d}:{int(match.group(2)):02d}"
+
+        # Try to parse various formats (strptime bound once for the loop)
+        strptime = datetime.strptime
+        for fmt in _TIME_FMTS:
             try:
-                dt = datetime.strptime(time_str, fmt)
+                dt = strptime(time_str, fmt)
                 return dt.strftime('%H:%M')
             except ValueError:
                 continue
@@ -266,19 +331,33 @@ class OmakaseParser:
         return time_str
 
     @staticmethod
-    def _looks_like_date(s: str) -> bool:
-        """Check if a string looks like a date"""
-        # Simple heuristic: contains digits and common date separators
-        if not isinstance(s, str):
+    def _is_ymd(year: str, month: str, day: str) -> bool:
+        """Check that ASCII-digit date parts form a real calendar date"""
+        digits = year + month + day
+        if not (digits.isascii() and digits.isdigit()):
             return False
-
-        # Must contain at least some digits
-        if not any(c.isdigit() for c in s):
+        try:
+            datetime(int(year), int(month), int(day))
+        except ValueError:
             return False
+        return True
 
-        # Common date patterns
-        date_patterns = ['-', '/', '年', '月', '日']
-        return any(sep in s for sep in date_patterns) or s.isdigit()
+    @staticmethod
+    def _is_hm(hour: str, minute: str) -> bool:
+        """Check that time parts are two-digit ASCII hour and minute values"""
+        digits = hour + minute
+        return (
+            len(digits) == 4 and digits.isascii() and digits.isdigit()
+            and int(hour) < 24 and int(minute) < 60
+        )
+
+    @staticmethod
+    def _looks_like_date(s: str) -> bool:
+        """Check if a string looks like a date"""
+        # Simple heuristic: all digits, or a digit plus a common date separator
+        return isinstance(s, str) and (
+            s.isdigit() or _DATE_SHAPE_RE.search(s) is not None
+        )
 
 
 def debug_api_response(api_response: dict | list) -> None:
@@ -288,8 +367,6 @@ def debug_api_response(api_response: dict | list) -> None:
     Call this function with the raw API response to see its structure
     and help identify the correct parsing strategy.
     """
-    import json
-
     print("=" * 60)
     print("API Response Debug Information")
     print("=" * 60)
@@ -0,0 +1,120 @@
+"""
+Adaptive polling interval based on when new slots have appeared before
+"""
+
+import logging
+import os
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from src.utils import _RNG, json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+# Times of day (minutes since midnight) at which new slots were detected,
+# keyed by restaurant slug
+HISTORY_FILE = "slot_history.json"
+
+# Number of most recent arrivals kept per restaurant
+MAX_HISTORY = 500
+
+# Jitter applied to each wait, as a fraction of the configured interval range
+JITTER_FRACTION = 0.1
+
+
+class AdaptiveInterval:
+    """
+    Choose the wait before the next check from the slot-arrival history
+
+    Arrivals are recorded per restaurant. The monitored restaurants'
+    arrivals are pooled and binned by hour of day (smoothed with the
+    neighbouring hours), since one wait covers a check of all of them.
+    Hours where new slots have often appeared get waits close to
+    interval_min, quiet hours get waits close to interval_max, so checks
+    are concentrated around restaurants' usual release times without
+    leaving the configured range. With no history the wait is uniform
+    between the two, as for fixed random polling.
+    """
+
+    def __init__(
+        self,
+        interval_min: float,
+        interval_max: float,
+        slugs: Iterable[str],
+        history_file: str = HISTORY_FILE
+    ):
+        self.interval_min = interval_min
+        self.interval_max = interval_max
+        # History of restaurants no longer monitored is kept but not used
+        self.slugs = frozenset(slugs)
+        self.history_path = Path(history_file)
+        self.arrivals: dict[str, list[int]] = self._load()
+        # Whether arrivals changed since they were loaded or last saved
+        self._dirty = False
+
+    def record_arrival(self, slug: str, when: datetime) -> None:
+        """Remember that new slots were detected for a restaurant at a time"""
+        arrivals = self.arrivals.setdefault(slug, [])
+        arrivals.append(when.hour * 60 + when.minute)
+        del arrivals[:-MAX_HISTORY]
+        self._dirty = True
+
+    def next_wait(self, now: datetime) -> float:
+        """Minutes to wait before the next check"""
+        low, high = self.interval_min, self.interval_max
+        arrivals = [
+            minute
+            for slug, minutes in self.arrivals.items() if slug in self.slugs
+            for minute in minutes
+        ]
+        if not arrivals:
+            return _RNG.uniform(low, high)
+
+        # Hourly counts, smoothed with the neighbouring hours (wrapping at
+        # midnight) and add-one smoothed so no hour is ignored entirely
+        counts = [0] * 24
+        for minute in arrivals:
+            counts[minute // 60] += 1
+        weights = [
+            counts[h] + 0.5 * (counts[h - 1] + counts[(h + 1) % 24]) + 1
+            for h in range(24)
+        ]
+
+        activity = weights[now.hour] / max(weights)
+        jitter = (high - low) * JITTER_FRACTION
+        wait = high - activity * (high - low) + _RNG.uniform(-jitter, jitter)
+        return min(max(wait, low), high)
+
+    def _load(self) -> dict[str, list[int]]:
+        """Load the per-restaurant arrival history from disk"""
+        if not self.history_path.exists():
+            return {}
+
+        try:
+            arrivals = {
+                str(slug): [int(minute) % 1440 for minute in minutes][-MAX_HISTORY:]
+                for slug, minutes in json_loads(
+                    self.history_path.read_bytes()
+                ).items()
+            }
+        except Exception as e:
+            logger.warning(
+                "Failed to load slot history from %s: %s", self.history_path, e
+            )
+            return {}
+        return arrivals
+
+    def save(self) -> None:
+        """Atomically write the arrival history to disk, if it changed"""
+        if not self._dirty:
+            return
+
+        tmp_path = self.history_path.with_name(self.history_path.name + ".tmp")
+        try:
+            tmp_path.write_bytes(json_dumps(self.arrivals))
+            os.replace(tmp_path, self.history_path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(
+                "Failed to save slot history to %s: %s", self.history_path, e
+            )
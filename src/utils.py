@@ -3,35 +3,154 @@ Utility functions
 """
 
 import asyncio
+import json
 import random
+import time
+from email.utils import parsedate_to_datetime
 from functools import wraps
 import logging
+import httpx
+
+# orjson is an optional, faster drop-in for the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Private RNG for delays and jitter, independent of the global random state
+_RNG = random.Random()
+
+# Transient errors worth retrying with backoff
+RETRYABLE_EXCEPTIONS = (
+    httpx.TransportError,
+    httpx.HTTPStatusError,
+    asyncio.TimeoutError,
+)
+
+
+def json_loads(data: bytes | str):
+    """Parse JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 
 async def random_delay(min_seconds: float = 1.0, max_seconds: float = 3.0) -> None:
     """Add random delay to avoid rate limiting"""
-    delay = random.uniform(min_seconds, max_seconds)
-    logger.debug(f"Random delay: {delay:.2f}s")
+    delay = _RNG.uniform(min_seconds, max_seconds)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Random delay: {delay:.2f}s")
     await asyncio.sleep(delay)
 
 
-def retry_on_failure(max_retries: int = 3, backoff_factor: float = 2.0):
-    """Decorator for exponential backoff retry"""
+class RateLimiter:
+    """
+    Space out requests based on the server's rate-limit headers
+
+    Register wait() as an httpx request hook and update() as a response
+    hook. Requests are only delayed when a response carried Retry-After or
+    reported that few requests remain in the current window.
+    """
+
+    def __init__(
+        self,
+        min_remaining: int = 1,
+        default_delay: float = 1.0,
+        max_delay: float = 300.0
+    ):
+        self.min_remaining = min_remaining
+        self.default_delay = default_delay
+        self.max_delay = max_delay
+        self._ready_at = 0.0  # time.monotonic() before which we hold off
+
+    async def wait(self, request: httpx.Request | None = None) -> None:
+        """Sleep until the server is ready for the next request"""
+        delay = self._ready_at - time.monotonic()
+        if delay > 0:
+            logger.info(f"Rate limited, waiting {delay:.1f}s before next request")
+            await asyncio.sleep(delay)
+
+    async def update(self, response: httpx.Response) -> None:
+        """Record any wait requested by a response's rate-limit headers"""
+        delay = self._delay_from_headers(response.headers)
+        if delay > 0:
+            self._ready_at = max(
+                self._ready_at, time.monotonic() + min(delay, self.max_delay)
+            )
+
+    def _delay_from_headers(self, headers: httpx.Headers) -> float:
+        """Seconds to wait according to Retry-After / X-RateLimit-* headers"""
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            return self._parse_retry_after(retry_after)
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return 0.0
+        try:
+            if int(remaining) > self.min_remaining:
+                return 0.0
+        except ValueError:
+            return 0.0
+
+        # Nearly out of requests: wait for the window to reset if we can tell
+        # when that is (epoch seconds or a relative delay), else back off a bit
+        reset = headers.get('X-RateLimit-Reset')
+        try:
+            reset_value = float(reset)
+        except (TypeError, ValueError):
+            return self.default_delay
+        if reset_value > 1e9:
+            return max(reset_value - time.time(), 0.0)
+        return reset_value
+
+    def _parse_retry_after(self, value: str) -> float:
+        """Parse Retry-After given as delay-seconds or an HTTP date"""
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return self.default_delay
+        return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def retry_on_failure(
+    max_retries: int = 3,
+    backoff_factor: float = 2.0,
+    retry_on: tuple[type[BaseException], ...] = RETRYABLE_EXCEPTIONS
+):
+    """
+    Decorator for exponential backoff retry
+
+    Only exceptions in retry_on are retried; anything else (e.g. programming
+    errors) propagates immediately. Waits are jittered by +/-50% so
+    concurrent callers don't retry in lockstep.
+    """
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             for attempt in range(max_retries):
                 try:
                     return await func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     if attempt == max_retries - 1:
                         raise
-                    wait_time = backoff_factor ** attempt
+                    wait_time = backoff_factor ** attempt * _RNG.uniform(0.5, 1.5)
                     logger.warning(
                         f"{func.__name__} failed (attempt {attempt + 1}/{max_retries}): {e}. "
-                        f"Retrying in {wait_time}s..."
+                        f"Retrying in {wait_time:.1f}s..."
                     )
                     await asyncio.sleep(wait_time)
         return wrapper
@@ -106,10 +106,13 @@ def test_email():
             app_password=config.gmail.app_password
         )
 
-        success = notifier.send_notification(
-            config.gmail.receiver_email,
-            notification
-        )
+        try:
+            success = notifier.send_notification(
+                config.gmail.receiver_email,
+                notification
+            )
+        finally:
+            notifier.close()
 
         if success:
             print("✓ Email sent successfully!")
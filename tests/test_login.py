@@ -25,44 +25,47 @@ from src.omakase_client import OmakaseClient
 
 async def test_login():
     """Test login functionality"""
-    print("=" * 60)
-    print("Testing omakase.in Login")
-    print("=" * 60)
+    # Each block of lines is printed with one call (one stdout write)
+    print("\n".join([
+        "=" * 60,
+        "Testing omakase.in Login",
+        "=" * 60,
+    ]))
 
     # Step 1: Load configuration
     print("\n[1/5] Loading configuration...")
     try:
         config = load_config("config.yaml")
-        print(f"✓ Configuration loaded successfully")
-        print(f"  - Omakase email: {config.omakase.email}")
-        print(f"  - Restaurants: {len(config.restaurants)}")
+        print("\n".join([
+            "✓ Configuration loaded successfully",
+            f"  - Omakase email: {config.omakase.email}",
+            f"  - Restaurants: {len(config.restaurants)}",
+        ]))
     except FileNotFoundError as e:
-        print(f"✗ Error: {e}")
-        print("\nPlease create config.yaml from config.yaml.example")
+        print(f"✗ Error: {e}\n\nPlease create config.yaml from config.yaml.example")
         return False
     except ValueError as e:
-        print(f"✗ Configuration validation failed:")
-        print(f"  {e}")
+        print(f"✗ Configuration validation failed:\n  {e}")
         return False
 
     # Step 2: Validate configuration
     print("\n[2/5] Validating configuration...")
     errors = validate_config(config)
     if errors:
-        print(f"✗ Configuration has errors:")
-        for error in errors:
-            print(f"  - {error}")
+        print("\n".join(
+            ["✗ Configuration has errors:"] + [f"  - {error}" for error in errors]
+        ))
         return False
     print("✓ Configuration is valid")
 
     # Step 3: Check for existing cookies
-    print("\n[3/5] Checking for existing cookies...")
+    lines = ["\n[3/5] Checking for existing cookies..."]
     cookies_file = Path("cookies.json")
     if cookies_file.exists():
-        print(f"✓ Found existing cookies file")
-        print(f"  - Location: {cookies_file}")
+        lines += ["✓ Found existing cookies file", f"  - Location: {cookies_file}"]
     else:
-        print(f"  - No existing cookies found (will create after login)")
+        lines.append("  - No existing cookies found (will create after login)")
+    print("\n".join(lines))
 
     # Step 4: Initialize client and attempt login
     print("\n[4/5] Attempting login to omakase.in...")
@@ -74,13 +77,17 @@ async def test_login():
             )
 
             if success:
-                print("✓ Login successful!")
-                print(f"  - Session established")
-                print(f"  - Cookies saved to: cookies.json")
+                print("\n".join([
+                    "✓ Login successful!",
+                    "  - Session established",
+                    "  - Cookies saved to: cookies.json",
+                ]))
             else:
-                print("✗ Login failed")
-                print("  - Check your email/password in config.yaml")
-                print("  - Check if omakase.in is accessible")
+                print("\n".join([
+                    "✗ Login failed",
+                    "  - Check your email/password in config.yaml",
+                    "  - Check if omakase.in is accessible",
+                ]))
                 return False
 
     except Exception as e:
@@ -100,17 +107,18 @@ async def test_login():
             )
 
             if success and client.is_logged_in:
-                print("✓ Cookie persistence working")
-                print("  - Reused existing session")
+                print("✓ Cookie persistence working\n  - Reused existing session")
             else:
                 print("⚠ Cookie persistence may have issues")
 
     except Exception as e:
         print(f"⚠ Error testing cookie persistence: {e}")
 
-    print("\n" + "=" * 60)
-    print("Login Test Completed Successfully! ✓")
-    print("=" * 60)
+    print("\n".join([
+        "\n" + "=" * 60,
+        "Login Test Completed Successfully! ✓",
+        "=" * 60,
+    ]))
     return True
 
 
@@ -23,14 +23,17 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config import load_config, validate_config
-from src.monitor import MonitorService
+from src.monitor import MonitorService, STATE_FILE
 
 
 async def test_monitor():
     """Test complete monitoring workflow"""
-    print("=" * 60)
-    print("Testing Complete Monitoring Workflow")
-    print("=" * 60)
+    # Each block of lines is printed with one call (one stdout write)
+    print("\n".join([
+        "=" * 60,
+        "Testing Complete Monitoring Workflow",
+        "=" * 60,
+    ]))
 
     # Step 1: Load and validate configuration
     print("\n[1/6] Loading configuration...")
@@ -40,23 +43,22 @@ async def test_monitor():
 
         errors = validate_config(config)
         if errors:
-            print(f"✗ Configuration validation failed:")
-            for error in errors:
-                print(f"  - {error}")
+            print("\n".join(
+                ["✗ Configuration validation failed:"]
+                + [f"  - {error}" for error in errors]
+            ))
             return False
 
-        print(f"✓ Configuration validated")
-        print(f"  - Omakase account: {config.omakase.email}")
-        print(f"  - Total restaurants: {len(config.restaurants)}")
-
-        enabled = [r for r in config.restaurants if r.enabled]
-        print(f"  - Enabled restaurants: {len(enabled)}")
-        for r in enabled:
-            print(f"    • {r.name} (slug: {r.slug})")
+        enabled = config.enabled_restaurants
+        print("\n".join([
+            "✓ Configuration validated",
+            f"  - Omakase account: {config.omakase.email}",
+            f"  - Total restaurants: {len(config.restaurants)}",
+            f"  - Enabled restaurants: {len(enabled)}",
+        ] + [f"    • {r.name} (slug: {r.slug})" for r in enabled]))
 
     except FileNotFoundError as e:
-        print(f"✗ Error: {e}")
-        print("\nPlease create config.yaml from config.yaml.example")
+        print(f"✗ Error: {e}\n\nPlease create config.yaml from config.yaml.example")
         return False
     except Exception as e:
         print(f"✗ Error: {e}")
@@ -66,11 +68,13 @@ async def test_monitor():
 
     # Step 2: Check for enabled restaurants
     print("\n[2/6] Checking restaurant configuration...")
-    enabled_restaurants = [r for r in config.restaurants if r.enabled]
+    enabled_restaurants = config.enabled_restaurants
 
     if not enabled_restaurants:
-        print("✗ No enabled restaurants found")
-        print("  Please enable at least one restaurant in config.yaml")
+        print(
+            "✗ No enabled restaurants found\n"
+            "  Please enable at least one restaurant in config.yaml"
+        )
         return False
 
     print(f"✓ Found {len(enabled_restaurants)} enabled restaurant(s)")
@@ -79,83 +83,112 @@ async def test_monitor():
     print("\n[3/6] Initializing monitoring service...")
     try:
         monitor = MonitorService(config)
-        print("✓ MonitorService initialized")
-        print(f"  - Gmail notifier configured")
-        print(f"  - Previous slots cache: empty (first run)")
+        cached = sum(len(slots) for slots in monitor.previous_slots)
+        print("\n".join([
+            "✓ MonitorService initialized",
+            "  - Gmail notifier configured",
+            f"  - Previous slots cache: {cached} slot(s) loaded from {STATE_FILE}"
+            if cached else "  - Previous slots cache: empty (first run)",
+        ]))
     except Exception as e:
         print(f"✗ Error initializing monitor: {e}")
         return False
 
     # Step 4: Confirm test execution
-    print("\n[4/6] Test execution confirmation")
-    print("⚠  This test will:")
-    print("  1. Login to omakase.in with your credentials")
-    print("  2. Fetch actual time slots from configured restaurants")
-    print("  3. Check for changes (first run will show all as 'new')")
-    print("  4. Send email notifications if new slots are found")
-
-    response = input("\nDo you want to proceed? (yes/no): ").strip().lower()
-    if response not in ['yes', 'y']:
+    # Connect and log in while the user reads the prompt; monitor.start()
+    # then reuses the open client and session
+    async def prewarm():
+        await monitor.client.start()
+        return await monitor.client.login(
+            config.omakase.email,
+            config.omakase.password
+        )
+
+    prewarm_task = asyncio.create_task(prewarm())
+
+    print("\n".join([
+        "\n[4/6] Test execution confirmation",
+        "⚠  This test will:",
+        "  1. Login to omakase.in with your credentials (starts now)",
+        "  2. Fetch actual time slots from configured restaurants",
+        "  3. Check for changes (first run will show all as 'new';",
+        f"     slots already saved in {STATE_FILE} are not reported again)",
+        "  4. Send email notifications if new slots are found",
+    ]))
+
+    # Read the answer off the event loop so the login above keeps running
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(
+        None, input, "\nDo you want to proceed? (yes/no): "
+    )
+    if response.strip().lower() not in ['yes', 'y']:
+        prewarm_task.cancel()
+        await asyncio.gather(prewarm_task, return_exceptions=True)
+        await monitor.stop()
         print("Test cancelled by user")
         return False
 
+    # A failed prewarm is retried (and reported) by monitor.start()
+    await asyncio.gather(prewarm_task, return_exceptions=True)
+
     # Step 5: Run monitoring cycle
-    print("\n[5/6] Running monitoring cycle...")
-    print("-" * 60)
+    print("\n[5/6] Running monitoring cycle...\n" + "-" * 60)
     try:
         await monitor.start()
-        print("-" * 60)
-        print("✓ Monitoring cycle completed successfully")
+        print("-" * 60 + "\n✓ Monitoring cycle completed successfully")
 
     except Exception as e:
-        print("-" * 60)
-        print(f"✗ Error during monitoring: {e}")
+        print("-" * 60 + f"\n✗ Error during monitoring: {e}")
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        await monitor.stop()
 
     # Step 6: Display results
-    print("\n[6/6] Results summary...")
+    lines = ["\n[6/6] Results summary..."]
 
     cache_summary = []
-    for slug, slots in monitor.previous_slots.items():
-        cache_summary.append((slug, len(slots)))
-
-    if cache_summary:
-        print("✓ Cache updated with current state:")
-        for slug, count in cache_summary:
-            restaurant_name = next(
-                (r.name for r in config.restaurants if r.slug == slug),
-                slug
-            )
-            print(f"  - {restaurant_name}: {count} slot(s) cached")
-    else:
-        print("  - No slots were cached (all restaurants returned empty)")
+    for restaurant, slots in zip(monitor.restaurants, monitor.previous_slots):
+        cache_summary.append((restaurant.name, len(slots)))
 
-    print("\n" + "=" * 60)
-    print("Monitoring Test Completed! ✓")
-    print("=" * 60)
-
-    print("\nTest Results:")
-    print("  1. ✓ Configuration loaded and validated")
-    print("  2. ✓ MonitorService initialized")
-    print("  3. ✓ Login to omakase.in succeeded")
-    print("  4. ✓ API calls completed")
-    print("  5. ✓ Response parsing worked")
-    print("  6. ✓ Change detection functional")
+    if any(count > 0 for _, count in cache_summary):
+        lines.append("✓ Cache updated with current state:")
+        for restaurant_name, count in cache_summary:
+            lines.append(f"  - {restaurant_name}: {count} slot(s) cached")
+    else:
+        lines.append("  - No slots were cached (all restaurants returned empty)")
+
+    lines += [
+        "\n" + "=" * 60,
+        "Monitoring Test Completed! ✓",
+        "=" * 60,
+        "\nTest Results:",
+        "  1. ✓ Configuration loaded and validated",
+        "  2. ✓ MonitorService initialized",
+        "  3. ✓ Login to omakase.in succeeded",
+        "  4. ✓ API calls completed",
+        "  5. ✓ Response parsing worked",
+        "  6. ✓ Change detection functional",
+    ]
 
     if any(count > 0 for _, count in cache_summary):
-        print("\nNext Steps:")
-        print("  - Run this test again to verify change detection")
-        print("  - Only truly NEW slots will trigger notifications on subsequent runs")
-        print("  - Check your email if notifications were sent")
+        lines += [
+            "\nNext Steps:",
+            "  - Run this test again to verify change detection",
+            "  - Only truly NEW slots will trigger notifications on subsequent runs",
+            "  - Check your email if notifications were sent",
+        ]
     else:
-        print("\nNote:")
-        print("  - No time slots were found for configured restaurants")
-        print("  - This could mean:")
-        print("    1. Restaurants are fully booked")
-        print("    2. No upcoming time slots available")
-        print("    3. Restaurant slug is incorrect")
+        lines += [
+            "\nNote:",
+            "  - No time slots were found for configured restaurants",
+            "  - This could mean:",
+            "    1. Restaurants are fully booked",
+            "    2. No upcoming time slots available",
+            "    3. Restaurant slug is incorrect",
+        ]
+    print("\n".join(lines))
 
     return True
 
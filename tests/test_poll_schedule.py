@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive polling interval
+
+Usage:
+    python tests/test_poll_schedule.py
+
+This script tests:
+- Waits stay within interval_min..interval_max
+- Waits shorten in hours where slots have appeared before
+- History persistence and corrupt history files
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.poll_schedule import AdaptiveInterval
+
+INTERVAL_MIN = 5
+INTERVAL_MAX = 10
+SAMPLES = 200
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    """A datetime on a fixed day at the given time"""
+    return datetime(2026, 2, 15, hour, minute)
+
+
+def _mean_wait(schedule: AdaptiveInterval, hour: int) -> float:
+    """Average of many next_wait draws at the given hour"""
+    return sum(schedule.next_wait(_at(hour)) for _ in range(SAMPLES)) / SAMPLES
+
+
+def test_poll_schedule():
+    """Test AdaptiveInterval with and without history"""
+    print("=" * 60)
+    print("Testing Adaptive Polling Interval")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history_file = str(Path(tmp) / "slot_history.json")
+
+        # Test Case 1: No history
+        print("\n[Test 1] No history")
+        schedule = AdaptiveInterval(
+            INTERVAL_MIN, INTERVAL_MAX, ["a"], history_file
+        )
+        assert schedule.arrivals == {}, "Missing file should load as empty"
+        waits = [schedule.next_wait(_at(h)) for h in range(24) for _ in range(20)]
+        print(f"  - Waits: {min(waits):.2f}..{max(waits):.2f} minutes")
+        assert all(INTERVAL_MIN <= w <= INTERVAL_MAX for w in waits), \
+            "Waits should stay within the configured range"
+        print("  ✓ Passed")
+
+        # Test Case 2: Slots usually appear around 19:00
+        print("\n[Test 2] History concentrated around 19:00")
+        for day in range(30):
+            schedule.record_arrival("a", _at(19, day % 60))
+        waits = [schedule.next_wait(_at(h)) for h in range(24) for _ in range(20)]
+        busy, quiet = _mean_wait(schedule, 19), _mean_wait(schedule, 3)
+        print(f"  - Mean wait at 19:00: {busy:.2f} minutes")
+        print(f"  - Mean wait at 03:00: {quiet:.2f} minutes")
+        assert all(INTERVAL_MIN <= w <= INTERVAL_MAX for w in waits), \
+            "Waits should stay within the configured range"
+        assert busy < INTERVAL_MIN + 1, "Busy hour should wait close to interval_min"
+        assert quiet > INTERVAL_MAX - 1, "Quiet hour should wait close to interval_max"
+        print("  ✓ Passed")
+
+        # Test Case 3: Only monitored restaurants count
+        print("\n[Test 3] History of unmonitored restaurants")
+        other = AdaptiveInterval(INTERVAL_MIN, INTERVAL_MAX, ["b"], history_file)
+        other.arrivals = schedule.arrivals
+        quiet = _mean_wait(other, 19)
+        print(f"  - Mean wait at 19:00: {quiet:.2f} minutes")
+        assert quiet > INTERVAL_MIN + 1, "Other restaurants' history should be ignored"
+        print("  ✓ Passed")
+
+        # Test Case 4: Save and reload
+        print("\n[Test 4] Save and reload")
+        schedule.save()
+        reloaded = AdaptiveInterval(
+            INTERVAL_MIN, INTERVAL_MAX, ["a"], history_file
+        )
+        assert reloaded.arrivals == schedule.arrivals, "History should round-trip"
+        print(f"  - Reloaded {len(reloaded.arrivals['a'])} arrival(s)")
+        print("  ✓ Passed")
+
+        # Test Case 5: Corrupt history file
+        print("\n[Test 5] Corrupt history file")
+        for content in (b"{not json", b"[1, 2, 3]", b'{"a": ["x"]}'):
+            Path(history_file).write_bytes(content)
+            corrupt = AdaptiveInterval(
+                INTERVAL_MIN, INTERVAL_MAX, ["a"], history_file
+            )
+            print(f"  - {content.decode()!r}: {corrupt.arrivals}")
+            assert corrupt.arrivals == {}, "Corrupt history should load as empty"
+        print("  ✓ Passed")
+
+    print("\n" + "=" * 60)
+    print("All Poll Schedule Tests Passed! ✓")
+    print("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        result = test_poll_schedule()
+        sys.exit(0 if result else 1)
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for rate-limit header handling
+
+Usage:
+    python tests/test_rate_limiter.py
+
+This script tests:
+- Retry-After as seconds, as an HTTP date and malformed
+- X-RateLimit-Remaining / X-RateLimit-Reset (epoch and relative)
+- The max_delay cap
+"""
+
+import asyncio
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils import RateLimiter
+
+# Allowed error for delays computed from the wall clock; all other cases
+# must match exactly
+CLOCK_TOLERANCE = 2.0
+
+# (title, response headers, expected delay in seconds, allowed error)
+CASES = [
+    ("No rate-limit headers", {}, 0.0, 0.0),
+    ("Retry-After in seconds", {"Retry-After": "30"}, 30.0, 0.0),
+    ("Retry-After as an HTTP date",
+     {"Retry-After": formatdate(time.time() + 60, usegmt=True)}, 60.0,
+     CLOCK_TOLERANCE),
+    ("Retry-After date in the past",
+     {"Retry-After": formatdate(time.time() - 60, usegmt=True)}, 0.0, 0.0),
+    ("Malformed Retry-After", {"Retry-After": "soon"}, 1.0, 0.0),
+    ("Requests remaining", {"X-RateLimit-Remaining": "10"}, 0.0, 0.0),
+    ("Malformed X-RateLimit-Remaining",
+     {"X-RateLimit-Remaining": "lots"}, 0.0, 0.0),
+    ("Nearly out, reset as epoch seconds",
+     {"X-RateLimit-Remaining": "1",
+      "X-RateLimit-Reset": str(int(time.time()) + 20)}, 20.0,
+     CLOCK_TOLERANCE),
+    ("Nearly out, reset as relative seconds",
+     {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "15"}, 15.0, 0.0),
+    ("Nearly out, no reset", {"X-RateLimit-Remaining": "0"}, 1.0, 0.0),
+    ("Retry-After wins over X-RateLimit-*",
+     {"Retry-After": "5", "X-RateLimit-Remaining": "0",
+      "X-RateLimit-Reset": "100"}, 5.0, 0.0),
+]
+
+
+def test_rate_limiter():
+    """Test RateLimiter delays for various response headers"""
+    print("=" * 60)
+    print("Testing Rate Limiter")
+    print("=" * 60)
+
+    limiter = RateLimiter(min_remaining=1, default_delay=1.0, max_delay=300.0)
+
+    for number, (name, headers, expected, tolerance) in enumerate(CASES, 1):
+        print(f"\n[Test {number}] {name}")
+        delay = limiter._delay_from_headers(httpx.Headers(headers))
+        print(f"  - Headers: {headers}")
+        print(f"  - Delay: {delay:.1f}s (expected {expected:.1f}s)")
+        assert abs(delay - expected) <= tolerance, f"{name}: unexpected delay"
+        print("  ✓ Passed")
+
+    number = len(CASES) + 1
+    print(f"\n[Test {number}] Delays are capped at max_delay")
+    capped = RateLimiter(max_delay=10.0)
+    response = httpx.Response(429, headers={"Retry-After": "3600"})
+    asyncio.run(capped.update(response))
+    remaining = capped._ready_at - time.monotonic()
+    print(f"  - Retry-After: 3600s, next request in {remaining:.1f}s")
+    assert 0 < remaining <= 10.0, "Delay should be capped at max_delay"
+    print("  ✓ Passed")
+
+    print(f"\n[Test {number + 1}] No wait without a pending delay")
+    start = time.monotonic()
+    asyncio.run(RateLimiter().wait())
+    elapsed = time.monotonic() - start
+    print(f"  - wait() returned after {elapsed:.3f}s")
+    assert elapsed < 0.5, "wait() should return immediately"
+    print("  ✓ Passed")
+
+    print("\n" + "=" * 60)
+    print("All Rate Limiter Tests Passed! ✓")
+    print("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        result = test_rate_limiter()
+        sys.exit(0 if result else 1)
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)